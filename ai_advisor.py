@@ -2,8 +2,135 @@
 AI Advisor Module - Uses LLM to analyze profiles and make recommendations
 """
 from typing import List, Dict, Optional
+from collections import OrderedDict
+from functools import lru_cache
 from user_profile import UserProfile
+import asyncio
 import json
+import os
+import numpy as np
+
+
+# Maximum number of LLM insights kept in the AIAdvisor prompt cache
+INSIGHTS_CACHE_SIZE = 256
+
+# Local model used for AI insights
+OLLAMA_MODEL = 'llama2'
+
+# Instructions sent as the system prompt on every LLM call. The text never
+# changes, so Ollama can reuse its cached prefill across profiles; the
+# per-profile data goes in the user prompt after it.
+SYSTEM_PREFIX = (
+    "You are a financial advisor. Analyze the financial profile you are given "
+    "and provide personalized investment advice: 2-3 key personalized insights "
+    "and recommendations."
+)
+
+# Models already verified with the Ollama server, persisted across runs
+_OLLAMA_READY_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'wairren', 'ollama_ready.json')
+_OLLAMA_READY: Optional[set] = None
+
+
+def _lru_put(cache: OrderedDict, key, value):
+    """Store a value in an LRU cache, evicting the oldest entry when full"""
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > INSIGHTS_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _ensure_ollama_model(client, model: str) -> bool:
+    """Check once per model that the Ollama server can serve it"""
+    global _OLLAMA_READY
+    if _OLLAMA_READY is None:
+        try:
+            with open(_OLLAMA_READY_PATH, 'r') as f:
+                _OLLAMA_READY = set(json.load(f))
+        except (OSError, ValueError):
+            _OLLAMA_READY = set()
+    
+    if model in _OLLAMA_READY:
+        return True
+    
+    try:
+        client.show(model)
+    except Exception as e:
+        print(f"Warning: Ollama model '{model}' not available: {e}")
+        return False
+    
+    _OLLAMA_READY.add(model)
+    _save_ollama_ready()
+    return True
+
+
+def _forget_ollama_model(model: str):
+    """Drop a model from the verified set after the server failed to serve it"""
+    if _OLLAMA_READY and model in _OLLAMA_READY:
+        _OLLAMA_READY.discard(model)
+        _save_ollama_ready()
+
+
+def _save_ollama_ready():
+    """Persist the verified models so later runs can skip the check"""
+    try:
+        os.makedirs(os.path.dirname(_OLLAMA_READY_PATH), exist_ok=True)
+        with open(_OLLAMA_READY_PATH, 'w') as f:
+            json.dump(sorted(_OLLAMA_READY), f)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=512)
+def _allocation(age: int, risk_tolerance: str) -> tuple:
+    """
+    Asset allocation percentages for an age and risk tolerance
+    
+    Returns (stocks, bonds, large_cap, mid_cap, small_cap, international).
+    """
+    # Rule of thumb: 110 - age = stock percentage
+    base_stock_percentage = 110 - age
+    
+    # Adjust based on risk tolerance
+    risk_adjustments = {
+        'conservative': -15,
+        'moderate': 0,
+        'aggressive': 15
+    }
+    
+    adjustment = risk_adjustments.get(risk_tolerance, 0)
+    stock_percentage = max(30, min(90, base_stock_percentage + adjustment))
+    bond_percentage = 100 - stock_percentage
+    
+    # Further breakdown of stock allocation
+    large_cap = stock_percentage * 0.60
+    mid_cap = stock_percentage * 0.25
+    small_cap = stock_percentage * 0.10
+    international = stock_percentage * 0.05
+    
+    return (
+        round(stock_percentage, 1),
+        round(bond_percentage, 1),
+        round(large_cap, 1),
+        round(mid_cap, 1),
+        round(small_cap, 1),
+        round(international, 1)
+    )
+
+
+@lru_cache(maxsize=512)
+def _strategy(horizon: str, risk_tolerance: str) -> str:
+    """Overall investment strategy for a retirement horizon (short/medium/long)"""
+    if horizon == 'short':
+        return "Capital Preservation - Focus on stable dividend stocks and bonds"
+    elif horizon == 'medium':
+        return "Balanced Growth - Mix of growth and dividend stocks with some bonds"
+    else:
+        if risk_tolerance == 'aggressive':
+            return "Aggressive Growth - Focus on high-growth stocks and emerging sectors"
+        elif risk_tolerance == 'conservative':
+            return "Conservative Growth - Blue-chip dividend stocks and bonds"
+        else:
+            return "Moderate Growth - Diversified portfolio with growth and value stocks"
 
 
 class AIAdvisor:
@@ -18,6 +145,9 @@ class AIAdvisor:
         """
         self.use_ollama = use_ollama
         self.ollama_client = None
+        self._llm_cache: OrderedDict = OrderedDict()
+        self._pref_sectors_key: Optional[tuple] = None
+        self._pref_sectors_lc: frozenset = frozenset()
         
         if use_ollama:
             try:
@@ -26,14 +156,59 @@ class AIAdvisor:
             except ImportError:
                 print("Warning: Ollama not available. Falling back to rule-based system.")
                 self.use_ollama = False
+        
+        if self.ollama_client and not _ensure_ollama_model(self.ollama_client, OLLAMA_MODEL):
+            print("Falling back to rule-based system.")
+            self.ollama_client = None
+            self.use_ollama = False
     
     def analyze_profile(self, profile: UserProfile) -> Dict:
         """Analyze user profile and generate insights"""
+        analysis = self._compute_analysis(profile)
+        
+        if self.use_ollama and self.ollama_client:
+            # Enhance with LLM analysis
+            analysis['ai_insights'] = self._get_llm_insights(profile, analysis)
+        
+        return analysis
+    
+    async def analyze_profiles_batch(self, profiles: List[UserProfile]) -> List[Dict]:
+        """
+        Analyze several profiles, requesting their LLM insights concurrently
+        
+        Args:
+            profiles: Profiles to analyze, e.g. the demo scenarios being compared
+        """
+        analyses = [self._compute_analysis(profile) for profile in profiles]
+        
+        if self.use_ollama and self.ollama_client:
+            # The client owns an HTTP connection pool, closed on leaving the block
+            async with self.ollama_client.AsyncClient() as client:
+                insights = await asyncio.gather(*(
+                    self._get_llm_insights_async(client, self._build_prompt(profile, analysis))
+                    for profile, analysis in zip(profiles, analyses)
+                ))
+            for analysis, insight in zip(analyses, insights):
+                analysis['ai_insights'] = insight
+        
+        return analyses
+    
+    def _preferred_sectors(self, profile: UserProfile) -> frozenset:
+        """Lowercased preferred sectors, rebuilt only when they change"""
+        key = tuple(profile.preferred_sectors)
+        if key != self._pref_sectors_key:
+            self._pref_sectors_key = key
+            self._pref_sectors_lc = frozenset(s.lower() for s in key)
+        return self._pref_sectors_lc
+    
+    def _compute_analysis(self, profile: UserProfile) -> Dict:
+        """Compute the rule-based profile analysis"""
         
         # Calculate key metrics
         monthly_income = profile.annual_income / 12
         savings_rate = ((monthly_income - profile.monthly_expenses) / monthly_income) * 100
         debt_to_income_ratio = (profile.total_debt / profile.annual_income) * 100
+        emergency_months = profile.current_savings / profile.monthly_expenses
         years_to_debt_free = profile.total_debt / ((monthly_income - profile.monthly_expenses) * 12) if monthly_income > profile.monthly_expenses else float('inf')
         
         # Determine investment allocation based on risk tolerance and age
@@ -44,69 +219,52 @@ class AIAdvisor:
                 'savings_rate': round(savings_rate, 2),
                 'debt_to_income_ratio': round(debt_to_income_ratio, 2),
                 'years_to_debt_free': round(years_to_debt_free, 2) if years_to_debt_free != float('inf') else 'N/A',
-                'emergency_fund_months': round(profile.current_savings / profile.monthly_expenses, 1),
+                'emergency_fund_months': round(emergency_months, 1),
             },
             'recommended_allocation': allocation,
             'investment_strategy': self._determine_strategy(profile),
-            'risk_assessment': self._assess_risk(profile)
+            'risk_assessment': self._assess_risk(profile, emergency_months, debt_to_income_ratio)
         }
         
-        if self.use_ollama and self.ollama_client:
-            # Enhance with LLM analysis
-            analysis['ai_insights'] = self._get_llm_insights(profile, analysis)
-        
         return analysis
     
     def _determine_allocation(self, profile: UserProfile) -> Dict:
         """Determine asset allocation based on profile"""
-        # Rule of thumb: 110 - age = stock percentage
-        base_stock_percentage = 110 - profile.age
-        
-        # Adjust based on risk tolerance
-        risk_adjustments = {
-            'conservative': -15,
-            'moderate': 0,
-            'aggressive': 15
-        }
-        
-        adjustment = risk_adjustments.get(profile.risk_tolerance, 0)
-        stock_percentage = max(30, min(90, base_stock_percentage + adjustment))
-        bond_percentage = 100 - stock_percentage
-        
-        # Further breakdown of stock allocation
-        large_cap = stock_percentage * 0.60
-        mid_cap = stock_percentage * 0.25
-        small_cap = stock_percentage * 0.10
-        international = stock_percentage * 0.05
+        stocks, bonds, large_cap, mid_cap, small_cap, international = _allocation(
+            profile.age, profile.risk_tolerance
+        )
         
         return {
-            'stocks': round(stock_percentage, 1),
-            'bonds': round(bond_percentage, 1),
+            'stocks': stocks,
+            'bonds': bonds,
             'breakdown': {
-                'large_cap': round(large_cap, 1),
-                'mid_cap': round(mid_cap, 1),
-                'small_cap': round(small_cap, 1),
-                'international': round(international, 1),
-                'bonds': round(bond_percentage, 1)
+                'large_cap': large_cap,
+                'mid_cap': mid_cap,
+                'small_cap': small_cap,
+                'international': international,
+                'bonds': bonds
             }
         }
     
     def _determine_strategy(self, profile: UserProfile) -> str:
         """Determine overall investment strategy"""
         if profile.years_to_retirement <= 5:
-            return "Capital Preservation - Focus on stable dividend stocks and bonds"
+            horizon = 'short'
         elif profile.years_to_retirement <= 15:
-            return "Balanced Growth - Mix of growth and dividend stocks with some bonds"
+            horizon = 'medium'
         else:
-            if profile.risk_tolerance == 'aggressive':
-                return "Aggressive Growth - Focus on high-growth stocks and emerging sectors"
-            elif profile.risk_tolerance == 'conservative':
-                return "Conservative Growth - Blue-chip dividend stocks and bonds"
-            else:
-                return "Moderate Growth - Diversified portfolio with growth and value stocks"
+            horizon = 'long'
+        return _strategy(horizon, profile.risk_tolerance)
     
-    def _assess_risk(self, profile: UserProfile) -> str:
-        """Assess overall risk profile"""
+    def _assess_risk(self, profile: UserProfile, emergency_months: float,
+                     debt_to_income: float) -> str:
+        """
+        Assess overall risk profile
+        
+        Args:
+            emergency_months: Months of expenses covered by current savings
+            debt_to_income: Total debt as a percentage of annual income
+        """
         risk_factors = []
         
         # Income stability
@@ -114,12 +272,10 @@ class AIAdvisor:
             risk_factors.append("Lower income requires more conservative approach")
         
         # Debt level
-        debt_to_income = (profile.total_debt / profile.annual_income) * 100
         if debt_to_income > 40:
             risk_factors.append("High debt-to-income ratio")
         
         # Emergency fund
-        emergency_months = profile.current_savings / profile.monthly_expenses
         if emergency_months < 3:
             risk_factors.append("Insufficient emergency fund")
         
@@ -142,96 +298,121 @@ class AIAdvisor:
                                       stock_data: List[Dict],
                                       num_picks: int = 10) -> List[Dict]:
         """Generate personalized stock recommendations"""
-        recommendations = []
+        stocks = [stock for stock in stock_data if stock is not None]
+        if not stocks:
+            return []
         
-        # Score stocks based on profile
-        for stock in stock_data:
-            if stock is None:
-                continue
-            
-            score = self._score_stock(stock, profile)
-            
-            if score > 0:
-                recommendations.append({
-                    'ticker': stock['ticker'],
-                    'name': stock['name'],
-                    'sector': stock['sector'],
-                    'current_price': stock['current_price'],
-                    'dividend_yield': stock['dividend_yield'],
-                    'pe_ratio': stock['pe_ratio'],
-                    'score': score,
-                    'rationale': self._generate_rationale(stock, profile)
-                })
-        
-        # Sort by score and return top picks
-        recommendations.sort(key=lambda x: x['score'], reverse=True)
-        return recommendations[:num_picks]
-    
-    def _score_stock(self, stock: Dict, profile: UserProfile) -> float:
-        """Score a stock based on user profile"""
-        score = 50.0  # Base score
+        # Extract metrics once; scoring and rationale both read these arrays
+        metrics = self._stock_metrics(stocks, profile)
         
-        # Sector preference
-        if stock['sector'].lower() in [s.lower() for s in profile.preferred_sectors]:
-            score += 15
+        # Score all stocks at once and keep the top picks with a positive score
+        scores = self._score_stocks(metrics, profile)
+        top = self._top_picks(scores, num_picks)
         
-        # Risk tolerance adjustments
-        beta = stock.get('beta', 1.0)
+        recommendations = []
+        for i in top:
+            stock = stocks[i]
+            recommendations.append({
+                'ticker': stock['ticker'],
+                'name': stock['name'],
+                'sector': stock['sector'],
+                'current_price': stock['current_price'],
+                'dividend_yield': stock['dividend_yield'],
+                'pe_ratio': stock['pe_ratio'],
+                'score': float(scores[i]),
+                'rationale': self._generate_rationale(stock, metrics, i, profile)
+            })
+        
+        return recommendations
+    
+    @staticmethod
+    def _top_picks(scores: np.ndarray, num_picks: int) -> np.ndarray:
+        """Indices of the best positive scores, highest first, ties in input order"""
+        top = np.flatnonzero(scores > 0)
+        if num_picks <= 0:
+            return top[:0]
+        
+        if num_picks < len(top):
+            # Partial partition finds the k-th best score without a full sort;
+            # keep everything above it plus the earliest stocks tied with it
+            kth = len(top) - num_picks
+            threshold = np.partition(scores[top], kth)[kth]
+            above = top[scores[top] > threshold]
+            ties = top[scores[top] == threshold][:num_picks - len(above)]
+            top = np.concatenate((above, ties))
+        
+        return top[np.argsort(-scores[top], kind='stable')]
+    
+    def _stock_metrics(self, stocks: List[Dict], profile: UserProfile) -> Dict[str, np.ndarray]:
+        """Per-stock metric arrays used for scoring and rationale"""
+        preferred = self._preferred_sectors(profile)
+        
+        # Missing metrics become NaN, which fails every comparison on them
+        return {
+            'beta': np.array([s.get('beta', 1.0) for s in stocks], dtype=float),
+            'dividend_yield': np.array([s.get('dividend_yield', 0) for s in stocks], dtype=float),
+            'pe_ratio': np.array([s.get('pe_ratio', 0) for s in stocks], dtype=float),
+            'market_cap': np.array([s.get('market_cap', 0) for s in stocks], dtype=float),
+            'sector_match': np.array([s['sector'].lower() in preferred for s in stocks], dtype=bool)
+        }
+    
+    def _score_stocks(self, metrics: Dict[str, np.ndarray], profile: UserProfile) -> np.ndarray:
+        """Score stocks based on user profile"""
+        beta = metrics['beta']
+        dividend_yield = metrics['dividend_yield']
+        pe_ratio = metrics['pe_ratio']
+        market_cap = metrics['market_cap']
+        sector_match = metrics['sector_match']
+        
+        # Base score plus sector preference
+        score = 50.0 + np.where(sector_match, 15.0, 0.0)
+        
+        # Risk tolerance adjustments; the tolerance is per profile, so only
+        # one array expression is evaluated
         if profile.risk_tolerance == 'conservative':
-            if beta < 0.8:
-                score += 10
-            elif beta > 1.2:
-                score -= 10
+            score += np.select([beta < 0.8, beta > 1.2], [10.0, -10.0], 0.0)
             # Prefer dividend stocks
-            if stock['dividend_yield'] and stock['dividend_yield'] > 0.02:
-                score += 15
+            score += np.where(dividend_yield > 0.02, 15.0, 0.0)
         elif profile.risk_tolerance == 'aggressive':
-            if beta > 1.2:
-                score += 10
+            score += np.where(beta > 1.2, 10.0, 0.0)
             # Less emphasis on dividends
             score += 5
         else:  # moderate
-            if 0.8 <= beta <= 1.2:
-                score += 10
-            if stock['dividend_yield'] and stock['dividend_yield'] > 0.015:
-                score += 10
+            score += np.where((beta >= 0.8) & (beta <= 1.2), 10.0, 0.0)
+            score += np.where(dividend_yield > 0.015, 10.0, 0.0)
         
         # P/E ratio (value consideration)
-        pe_ratio = stock.get('pe_ratio', 0)
-        if pe_ratio and 10 <= pe_ratio <= 25:
-            score += 10
-        elif pe_ratio and pe_ratio > 40:
-            score -= 5
+        score += np.select([(pe_ratio >= 10) & (pe_ratio <= 25), pe_ratio > 40], [10.0, -5.0], 0.0)
         
         # Market cap (stability consideration)
-        market_cap = stock.get('market_cap', 0)
-        if market_cap > 100_000_000_000:  # Large cap
-            if profile.risk_tolerance == 'conservative':
-                score += 10
-        elif market_cap < 10_000_000_000:  # Small cap
-            if profile.risk_tolerance == 'aggressive':
-                score += 5
-        
-        return round(score, 2)
+        if profile.risk_tolerance == 'conservative':
+            score += np.where(market_cap > 100_000_000_000, 10.0, 0.0)  # Large cap
+        elif profile.risk_tolerance == 'aggressive':
+            score += np.where(market_cap < 10_000_000_000, 5.0, 0.0)  # Small cap
+        
+        return np.round(score, 2)
     
-    def _generate_rationale(self, stock: Dict, profile: UserProfile) -> str:
-        """Generate explanation for stock recommendation"""
+    def _generate_rationale(self, stock: Dict, metrics: Dict[str, np.ndarray],
+                            index: int, profile: UserProfile) -> str:
+        """Generate explanation for the stock at ``index`` of the metric arrays"""
         reasons = []
+        beta = metrics['beta'][index]
+        dividend_yield = metrics['dividend_yield'][index]
+        pe_ratio = metrics['pe_ratio'][index]
         
-        if stock['sector'].lower() in [s.lower() for s in profile.preferred_sectors]:
+        if metrics['sector_match'][index]:
             reasons.append(f"Matches your interest in {stock['sector']}")
         
-        if stock['dividend_yield'] and stock['dividend_yield'] > 0.03:
-            reasons.append(f"Strong dividend yield of {stock['dividend_yield']*100:.2f}%")
+        if dividend_yield > 0.03:
+            reasons.append(f"Strong dividend yield of {dividend_yield*100:.2f}%")
         
-        if stock.get('beta', 1.0) < 0.9 and profile.risk_tolerance == 'conservative':
+        if beta < 0.9 and profile.risk_tolerance == 'conservative':
             reasons.append("Lower volatility matches your risk tolerance")
         
-        if stock.get('beta', 1.0) > 1.1 and profile.risk_tolerance == 'aggressive':
+        if beta > 1.1 and profile.risk_tolerance == 'aggressive':
             reasons.append("Higher growth potential for aggressive strategy")
         
-        pe_ratio = stock.get('pe_ratio', 0)
-        if pe_ratio and 10 <= pe_ratio <= 20:
+        if 10 <= pe_ratio <= 20:
             reasons.append("Reasonable valuation")
         
         if not reasons:
@@ -239,14 +420,9 @@ class AIAdvisor:
         
         return "; ".join(reasons)
     
-    def _get_llm_insights(self, profile: UserProfile, analysis: Dict) -> str:
-        """Get additional insights from LLM (if available)"""
-        if not self.ollama_client:
-            return ""
-        
-        try:
-            prompt = f"""Analyze this financial profile and provide personalized investment advice:
-
+    def _build_prompt(self, profile: UserProfile, analysis: Dict) -> str:
+        """Build the per-profile part of the LLM prompt (follows SYSTEM_PREFIX)"""
+        return f"""Profile:
 Age: {profile.age}
 Income: ${profile.annual_income:,.0f}
 Savings: ${profile.current_savings:,.0f}
@@ -256,16 +432,60 @@ Goals: {', '.join(profile.major_life_goals)}
 
 Current Analysis:
 - Savings Rate: {analysis['financial_health']['savings_rate']:.1f}%
-- Investment Strategy: {analysis['investment_strategy']}
-
-Provide 2-3 key personalized insights and recommendations."""
-
-            response = self.ollama_client.generate(
-                model='llama2',
-                prompt=prompt
-            )
-            
-            return response.get('response', '')
+- Investment Strategy: {analysis['investment_strategy']}"""
+    
+    def _get_llm_insights(self, profile: UserProfile, analysis: Dict) -> str:
+        """Get additional insights from LLM (if available)"""
+        if not self.ollama_client:
+            return ""
+        
+        prompt = self._build_prompt(profile, analysis)
+        cached = self._cached_insights(prompt)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = self.ollama_client.generate(model=OLLAMA_MODEL, system=SYSTEM_PREFIX, prompt=prompt)
         except Exception as e:
-            print(f"LLM analysis error: {e}")
+            self._llm_failed(e)
             return ""
+        return self._store_insights(prompt, response)
+    
+    async def _get_llm_insights_async(self, client, prompt: str) -> str:
+        """Get insights for a prepared prompt from an Ollama AsyncClient"""
+        cached = self._cached_insights(prompt)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await client.generate(model=OLLAMA_MODEL, system=SYSTEM_PREFIX, prompt=prompt)
+        except Exception as e:
+            self._llm_failed(e)
+            return ""
+        return self._store_insights(prompt, response)
+    
+    def _cached_insights(self, prompt: str) -> Optional[str]:
+        """Insights previously generated for a prompt, or None"""
+        insights = self._llm_cache.get(prompt)
+        if insights is not None:
+            self._llm_cache.move_to_end(prompt)
+        return insights
+    
+    def _store_insights(self, prompt: str, response) -> str:
+        """Extract the insights from an LLM response and cache them for the prompt"""
+        insights = response.get('response', '')
+        if insights:
+            _lru_put(self._llm_cache, prompt, insights)
+        return insights
+    
+    def _llm_failed(self, error: Exception):
+        """Report an LLM error, falling back to rule-based mode if the model cannot be served"""
+        print(f"LLM analysis error: {error}")
+        
+        # Connection failures and unknown models (404) will not recover on retry,
+        # and the model must be verified again on the next run
+        if isinstance(error, ConnectionError) or getattr(error, 'status_code', None) == 404:
+            _forget_ollama_model(OLLAMA_MODEL)
+            print("Falling back to rule-based system.")
+            self.ollama_client = None
+            self.use_ollama = False
@@ -26,14 +26,14 @@ def get_demo_profile(scenario: str = "moderate") -> UserProfile:
             expected_income_growth=5.0,
             marital_status="single",
             num_dependents=0,
-            major_life_goals=[
+            major_life_goals=(
                 "Buy a house in 5 years",
                 "Build wealth for early retirement",
                 "Travel internationally"
-            ],
+            ),
             risk_tolerance="aggressive",
             investment_horizon=35,
-            preferred_sectors=["technology", "healthcare", "finance"],
+            preferred_sectors=("technology", "healthcare", "finance"),
             other_notes="Tech-savvy, interested in growth stocks"
         )
     
@@ -51,15 +51,15 @@ def get_demo_profile(scenario: str = "moderate") -> UserProfile:
             expected_income_growth=3.5,
             marital_status="married",
             num_dependents=2,
-            major_life_goals=[
+            major_life_goals=(
                 "Save for children's college education",
                 "Pay off mortgage early",
                 "Comfortable retirement",
                 "Family vacations"
-            ],
+            ),
             risk_tolerance="moderate",
             investment_horizon=25,
-            preferred_sectors=["consumer", "healthcare", "technology"],
+            preferred_sectors=("consumer", "healthcare", "technology"),
             other_notes="Family-oriented, balanced approach to investing"
         )
     
@@ -77,15 +77,15 @@ def get_demo_profile(scenario: str = "moderate") -> UserProfile:
             expected_income_growth=2.5,
             marital_status="married",
             num_dependents=0,
-            major_life_goals=[
+            major_life_goals=(
                 "Retire comfortably at 65",
                 "Generate passive income",
                 "Travel during retirement",
                 "Leave inheritance for children"
-            ],
+            ),
             risk_tolerance="conservative",
             investment_horizon=13,
-            preferred_sectors=["utilities", "consumer", "healthcare"],
+            preferred_sectors=("utilities", "consumer", "healthcare"),
             other_notes="Focus on capital preservation and income generation"
         )
     
@@ -103,15 +103,15 @@ def get_demo_profile(scenario: str = "moderate") -> UserProfile:
             expected_income_growth=0.0,
             marital_status="widowed",
             num_dependents=0,
-            major_life_goals=[
+            major_life_goals=(
                 "Maintain standard of living",
                 "Healthcare expenses",
                 "Stay financially independent",
                 "Support grandchildren"
-            ],
+            ),
             risk_tolerance="conservative",
             investment_horizon=5,
-            preferred_sectors=["utilities", "consumer", "healthcare"],
+            preferred_sectors=("utilities", "consumer", "healthcare"),
             other_notes="Retired, focus on income and preservation"
         )
     
@@ -2,30 +2,265 @@
 Financial Projections Module - Calculates future financial projections
 """
 from typing import List, Dict
+from collections import OrderedDict
 from user_profile import UserProfile
+import functools
 import numpy as np
 
+# Numba is imported on first use, as importing it takes a few hundred milliseconds
+_numba = None
+prange = range  # Rebound to numba.prange once Numba is loaded
+
+# Record layout of the array returned by FinancialProjector.project_net_worth
+NET_WORTH_FIELDS = [
+    ('year', 'i4'),
+    ('age', 'i4'),
+    ('net_worth', 'f8'),
+    ('annual_income', 'f8'),
+    ('annual_expenses', 'f8'),
+    ('annual_savings', 'f8')
+]
+
+
+def _load_numba():
+    """Import Numba on first use, or return None when it is not installed"""
+    global _numba, prange
+    if _numba is None:
+        try:
+            import numba
+        except ImportError:
+            return None
+        _numba = numba
+        prange = numba.prange
+    return _numba
+
+
+def _jit(signature: str, **options):
+    """
+    Compile a kernel with Numba on its first call
+    
+    The explicit signature compiles exactly one specialization, loaded from
+    Numba's disk cache after the first run. Runs the kernel as plain Python
+    when Numba is missing. Without fastmath the kernels keep Python's
+    floating point evaluation order, so they round like the NumPy path.
+    """
+    options = {'cache': True, **options}
+    
+    def decorator(func):
+        compiled = None
+        
+        @functools.wraps(func)
+        def kernel(*args):
+            nonlocal compiled
+            if compiled is None:
+                numba = _load_numba()
+                compiled = func if numba is None else numba.njit(signature, **options)(func)
+            return compiled(*args)
+        
+        return kernel
+    
+    return decorator
+
+
+# Maximum number of projection results memoized per FinancialProjector
+PROJECTION_CACHE_SIZE = 128
+
+
+# Maximum number of (rate, years) growth factor tables kept by _growth_factors
+GROWTH_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=GROWTH_CACHE_SIZE)
+def _growth_factors(rate: float, years: int) -> np.ndarray:
+    """
+    Compound growth factors (1 + rate) ** year for years 0..years
+    
+    The cached table is shared between callers, so it is read-only.
+    """
+    factors = np.power(1 + rate, np.arange(years + 1))
+    factors.flags.writeable = False
+    return factors
+
+
+def _compound(initial: float, rate: float, years: int) -> np.ndarray:
+    """initial * (1 + rate) ** year for years 0..years, compounded one year at a time"""
+    steps = np.full(years + 1, 1 + rate)
+    steps[0] = initial
+    return np.cumprod(steps)
+
+
+def _accumulate(initial: float, additions: np.ndarray, rate: float) -> np.ndarray:
+    """
+    v[t] = v[t-1] + (v[t-1] * rate + additions[t]), with v[0] = initial
+    
+    Runs the recurrence one year at a time, so results match the Numba kernels
+    to the last bit; over at most a few dozen years a list loop is also faster
+    than a closed form. additions[0] is ignored.
+    """
+    values = [initial]
+    for addition in additions[1:].tolist():
+        values.append(values[-1] + (values[-1] * rate + addition))
+    return np.array(values)
+
+
+def _freeze(value):
+    """Hashable equivalent of nested dicts/lists, for use in cache keys"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _memoize_projection(method):
+    """
+    Cache a projection per profile, arguments and projector settings
+    
+    Callers get a copy of the cached result so they cannot modify it. Only
+    worth it for projections that cost more than building the key and the
+    copy: the Monte Carlo simulation and the structured net worth array.
+    """
+    @functools.wraps(method)
+    def wrapper(self, profile, *args, **kwargs):
+        key = (method.__name__, profile, _freeze(args), _freeze(kwargs), self._settings_key())
+        result = self._projection_cache.get(key)
+        if result is None:
+            result = method(self, profile, *args, **kwargs)
+            self._projection_cache[key] = result
+            if len(self._projection_cache) > PROJECTION_CACHE_SIZE:
+                self._projection_cache.popitem(last=False)
+        else:
+            self._projection_cache.move_to_end(key)
+        
+        if isinstance(result, list):
+            return [dict(row) for row in result]
+        return result.copy()
+    
+    return wrapper
+
+
+def projections_as_dicts(projections) -> List[Dict]:
+    """Convert a structured projection array into a list of per-year dicts"""
+    names = projections.dtype.names
+    return [dict(zip(names, row)) for row in projections.tolist()]
+
+
+@_jit('UniTuple(f8[:], 4)(f8, f8, f8, f8, f8, f8, i8)')
+def _compound_networth(nw0, income0, exp0, g, infl, r, years):
+    """Year-by-year net worth, income, expenses and savings arrays"""
+    nw = np.empty(years + 1)
+    inc = np.empty(years + 1)
+    exp_ = np.empty(years + 1)
+    sav = np.empty(years + 1)
+    
+    nw[0] = nw0
+    inc[0] = income0
+    exp_[0] = exp0
+    sav[0] = income0 - exp0
+    
+    for year in range(1, years + 1):
+        inc[year] = inc[year - 1] * (1 + g)
+        exp_[year] = exp_[year - 1] * (1 + infl)
+        sav[year] = inc[year] - exp_[year]
+        nw[year] = nw[year - 1] + (nw[year - 1] * r + sav[year])
+    
+    return nw, inc, exp_, sav
+
+
+@_jit('UniTuple(f8[:], 2)(f8, f8, f8, i8)')
+def _compound_portfolio(v0, contrib, r, years):
+    """Year-by-year expected and conservative portfolio values"""
+    expected = np.empty(years + 1)
+    conservative = np.empty(years + 1)
+    
+    expected[0] = v0
+    conservative[0] = v0
+    
+    for year in range(1, years + 1):
+        expected[year] = expected[year - 1] + (expected[year - 1] * r + contrib)
+        conservative[year] = expected[year] * 0.85
+    
+    return expected, conservative
+
+
+@_jit('f4[:, :](f8, f8, f4[:, :])', parallel=True, fastmath=True)
+def _simulate_portfolio(v0, contrib, returns):
+    """Portfolio value paths for a (simulations x years) matrix of annual returns"""
+    n_sim, years = returns.shape
+    # Paths are stored as float32 to halve memory traffic; each path still
+    # accumulates in a float64 scalar
+    paths = np.empty((n_sim, years + 1), dtype=np.float32)
+    
+    for sim in prange(n_sim):
+        value = v0
+        paths[sim, 0] = value
+        for year in range(years):
+            value = value * (1 + returns[sim, year]) + contrib
+            paths[sim, year + 1] = value
+    
+    return paths
+
+
+def _simulate_portfolio_numpy(v0, contrib, returns):
+    """_simulate_portfolio stepping all simulations one year at a time with NumPy"""
+    n_sim, years = returns.shape
+    paths = np.empty((n_sim, years + 1), dtype=np.float32)
+    values = np.full(n_sim, float(v0))
+    paths[:, 0] = values
+    
+    for year in range(years):
+        values = values * (1 + returns[:, year]) + contrib
+        paths[:, year + 1] = values
+    
+    return paths
+
 
 class FinancialProjector:
     """Generates comprehensive financial projections"""
     
-    def __init__(self):
+    def __init__(self, use_numba: bool = False):
+        """
+        Initialize the projector
+        
+        Args:
+            use_numba: Run the yearly recurrences as Numba-compiled kernels.
+                Importing Numba costs a few hundred milliseconds, so this only
+                pays off for long horizons or repeated batch projections.
+        """
+        self.use_numba = use_numba
         self.inflation_rate = 0.03  # 3% annual inflation
         self.market_return_estimates = {
             'conservative': 0.05,
             'moderate': 0.07,
             'aggressive': 0.09
         }
+        self.monte_carlo_simulations = 2000
+        self.monte_carlo_seed = 42  # Fixed so repeated projections agree
+        self._projection_cache: OrderedDict = OrderedDict()
+    
+    def _settings_key(self) -> tuple:
+        """Projector settings that affect projection results"""
+        return (
+            self.use_numba,
+            self.inflation_rate,
+            tuple(sorted(self.market_return_estimates.items())),
+            self.monte_carlo_simulations,
+            self.monte_carlo_seed
+        )
     
+    @_memoize_projection
     def project_net_worth(self, profile: UserProfile, 
                           portfolio_allocation: Dict,
-                          years: int = None) -> List[Dict]:
-        """Project net worth over time"""
+                          years: int = None) -> np.ndarray:
+        """
+        Project net worth over time
+        
+        Returns a structured array with NET_WORTH_FIELDS columns, one row per year.
+        Use projections_as_dicts() for a list of dicts.
+        """
         if years is None:
             years = min(profile.years_to_retirement, 30)
         
-        projections = []
-        
         # Initial values
         current_net_worth = profile.current_savings - profile.total_debt
         annual_income = profile.annual_income
@@ -36,29 +271,30 @@ class FinancialProjector:
             profile.risk_tolerance, 0.07
         )
         
-        # Calculate annual savings
-        annual_savings = annual_income - annual_expenses
-        
-        for year in range(years + 1):
-            # Apply income growth
-            if year > 0:
-                annual_income *= (1 + profile.expected_income_growth / 100)
-                annual_expenses *= (1 + self.inflation_rate)
-                annual_savings = annual_income - annual_expenses
-            
-            # Calculate investment returns
-            if year > 0:
-                investment_return = current_net_worth * expected_return
-                current_net_worth += investment_return + annual_savings
-            
-            projections.append({
-                'year': year,
-                'age': profile.age + year,
-                'net_worth': round(current_net_worth, 2),
-                'annual_income': round(annual_income, 2),
-                'annual_expenses': round(annual_expenses, 2),
-                'annual_savings': round(annual_savings, 2)
-            })
+        if self.use_numba:
+            net_worths, incomes, expenses, savings = _compound_networth(
+                float(current_net_worth),
+                float(annual_income),
+                float(annual_expenses),
+                profile.expected_income_growth / 100,
+                self.inflation_rate,
+                expected_return,
+                years
+            )
+        else:
+            # Income and expenses compound from year 0; savings are their difference
+            incomes = _compound(annual_income, profile.expected_income_growth / 100, years)
+            expenses = _compound(annual_expenses, self.inflation_rate, years)
+            savings = incomes - expenses
+            net_worths = _accumulate(current_net_worth, savings, expected_return)
+        
+        projections = np.empty(years + 1, dtype=NET_WORTH_FIELDS)
+        projections['year'] = np.arange(years + 1)
+        projections['age'] = profile.age + projections['year']
+        projections['net_worth'] = np.round(net_worths, 2)
+        projections['annual_income'] = np.round(incomes, 2)
+        projections['annual_expenses'] = np.round(expenses, 2)
+        projections['annual_savings'] = np.round(savings, 2)
         
         return projections
     
@@ -67,21 +303,22 @@ class FinancialProjector:
         if years is None:
             years = min(profile.years_to_retirement, 30)
         
-        projections = []
-        annual_income = profile.annual_income
+        growth = _growth_factors(profile.expected_income_growth / 100, years)
+        incomes = profile.annual_income * growth
         
-        for year in range(years + 1):
-            if year > 0:
-                annual_income *= (1 + profile.expected_income_growth / 100)
-            
-            projections.append({
+        return [
+            {
                 'year': year,
                 'age': profile.age + year,
-                'gross_income': round(annual_income, 2),
-                'monthly_income': round(annual_income / 12, 2)
-            })
-        
-        return projections
+                'gross_income': gross,
+                'monthly_income': monthly
+            }
+            for year, gross, monthly in zip(
+                range(years + 1),
+                np.round(incomes, 2).tolist(),
+                np.round(incomes / 12, 2).tolist()
+            )
+        ]
     
     def project_dividends(self, profile: UserProfile, 
                          stock_recommendations: List[Dict],
@@ -105,33 +342,40 @@ class FinancialProjector:
         # Assume 5% annual dividend growth
         dividend_growth_rate = 0.05
         
-        projections = []
-        current_portfolio_value = initial_investment
         annual_contributions = (profile.annual_income - profile.monthly_expenses * 12) * stock_allocation_pct * dividend_stock_pct
         
-        for year in range(years + 1):
-            if year > 0:
-                # Portfolio grows with market and contributions
-                current_portfolio_value *= 1.07  # Market appreciation
-                current_portfolio_value += annual_contributions
-            
-            annual_dividend = current_portfolio_value * avg_dividend_yield
-            
-            # Dividend growth
-            if year > 0:
-                avg_dividend_yield *= (1 + dividend_growth_rate)
-            
-            projections.append({
+        # Portfolio grows with the market plus a fixed annual contribution:
+        # pv[t] = pv0 * m^t + c * (m^t - 1) / (m - 1)
+        market_growth_rate = 0.07  # Market appreciation
+        market_growth = _growth_factors(market_growth_rate, years)
+        portfolio_values = (initial_investment * market_growth
+                            + annual_contributions * (market_growth - 1) / market_growth_rate)
+        
+        # The yield grows each year, and each year's dividend is paid at the
+        # previous year's yield
+        dividend_yields = avg_dividend_yield * _growth_factors(dividend_growth_rate, years)
+        paid_yields = np.concatenate(([avg_dividend_yield], dividend_yields[:-1]))
+        annual_dividends = portfolio_values * paid_yields
+        
+        return [
+            {
                 'year': year,
                 'age': profile.age + year,
-                'portfolio_value': round(current_portfolio_value, 2),
-                'annual_dividend': round(annual_dividend, 2),
-                'monthly_dividend': round(annual_dividend / 12, 2),
-                'dividend_yield': round(avg_dividend_yield * 100, 2)
-            })
-        
-        return projections
+                'portfolio_value': pv,
+                'annual_dividend': div,
+                'monthly_dividend': monthly,
+                'dividend_yield': yld
+            }
+            for year, pv, div, monthly, yld in zip(
+                range(years + 1),
+                np.round(portfolio_values, 2).tolist(),
+                np.round(annual_dividends, 2).tolist(),
+                np.round(annual_dividends / 12, 2).tolist(),
+                np.round(dividend_yields * 100, 2).tolist()
+            )
+        ]
     
+    @_memoize_projection
     def project_portfolio_returns(self, profile: UserProfile,
                                   allocation: Dict,
                                   years: int = None) -> List[Dict]:
@@ -153,57 +397,70 @@ class FinancialProjector:
         bond_volatility = 0.05
         portfolio_volatility = (stock_pct * stock_volatility + bond_pct * bond_volatility)
         
-        projections = []
-        current_value = profile.current_savings
         annual_contribution = profile.annual_income - profile.monthly_expenses * 12
         
-        for year in range(years + 1):
-            # Calculate different scenarios
-            if year > 0:
-                # Expected case
-                expected_return = current_value * expected_annual_return
-                current_value += expected_return + annual_contribution
-                
-                # Best case (expected + 1.5 std dev)
-                best_case = current_value * (1 + 1.5 * portfolio_volatility)
-                
-                # Worst case (expected - 1.5 std dev)
-                worst_case = current_value * (1 - 1.5 * portfolio_volatility)
-                
-                # Conservative case (half the expected return)
-                conservative = current_value * 0.85
-            else:
-                best_case = current_value * 1.1
-                worst_case = current_value * 0.9
-                conservative = current_value
-            
-            projections.append({
+        if self.use_numba:
+            expected, conservative = _compound_portfolio(
+                float(profile.current_savings),
+                float(annual_contribution),
+                expected_annual_return,
+                years
+            )
+        else:
+            contributions = np.full(years + 1, float(annual_contribution))
+            expected = _accumulate(profile.current_savings, contributions, expected_annual_return)
+            conservative = expected * 0.85
+            conservative[0] = expected[0]
+        
+        # Best/worst cases are the 95th/5th percentiles of simulated market paths
+        rng = np.random.default_rng(self.monte_carlo_seed)
+        shocks = rng.standard_normal((self.monte_carlo_simulations, years), dtype=np.float32)
+        returns = np.float32(expected_annual_return) + np.float32(portfolio_volatility) * shocks
+        simulate = _simulate_portfolio if self.use_numba else _simulate_portfolio_numpy
+        paths = simulate(
+            float(profile.current_savings),
+            float(annual_contribution),
+            returns
+        )
+        worst, median, best = np.percentile(paths, [5, 50, 95], axis=0)
+        
+        return [
+            {
                 'year': year,
                 'age': profile.age + year,
-                'expected_value': round(current_value, 2),
-                'best_case': round(best_case, 2),
-                'worst_case': round(worst_case, 2),
-                'conservative_case': round(conservative, 2),
+                'expected_value': exp_value,
+                'best_case': best_case,
+                'median_case': median_case,
+                'worst_case': worst_case,
+                'conservative_case': conservative_case,
                 'total_contributions': round(annual_contribution * year, 2)
-            })
-        
-        return projections
+            }
+            for year, exp_value, best_case, median_case, worst_case, conservative_case in zip(
+                range(years + 1),
+                np.round(expected, 2).tolist(),
+                np.round(best, 2).tolist(),
+                np.round(median, 2).tolist(),
+                np.round(worst, 2).tolist(),
+                np.round(conservative, 2).tolist()
+            )
+        ]
     
     def calculate_retirement_readiness(self, profile: UserProfile,
-                                      net_worth_projections: List[Dict]) -> Dict:
+                                      net_worth_projections: np.ndarray) -> Dict:
         """Calculate retirement readiness metrics"""
         
         # Get net worth at retirement
         retirement_year = profile.years_to_retirement
         if retirement_year >= len(net_worth_projections):
-            retirement_net_worth = net_worth_projections[-1]['net_worth']
+            retirement_net_worth = float(net_worth_projections['net_worth'][-1])
         else:
-            retirement_net_worth = net_worth_projections[retirement_year]['net_worth']
+            retirement_net_worth = float(net_worth_projections['net_worth'][retirement_year])
         
         # Estimate retirement expenses (80% of current expenses, adjusted for inflation)
         years_to_retirement = profile.years_to_retirement
         retirement_expenses = profile.monthly_expenses * 12 * 0.80
-        retirement_expenses *= (1 + self.inflation_rate) ** years_to_retirement
+        inflation_factors = _growth_factors(self.inflation_rate, years_to_retirement)
+        retirement_expenses *= float(inflation_factors[years_to_retirement])
         
         # 4% rule - safe withdrawal rate
         safe_annual_withdrawal = retirement_net_worth * 0.04
@@ -238,11 +495,11 @@ class FinancialProjector:
         retirement = projections['retirement_readiness']
         
         # Current state
-        current_net_worth = net_worth_proj[0]['net_worth']
+        current_net_worth = float(net_worth_proj['net_worth'][0])
         
         # Future state (10 years or retirement)
         future_years = min(10, len(net_worth_proj) - 1)
-        future_net_worth = net_worth_proj[future_years]['net_worth']
+        future_net_worth = float(net_worth_proj['net_worth'][future_years])
         future_income = income_proj[future_years]['gross_income']
         future_dividend = dividend_proj[future_years]['annual_dividend']
         
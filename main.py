@@ -5,6 +5,7 @@ Main application entry point
 """
 import sys
 import argparse
+import asyncio
 from user_profile import UserProfile, collect_user_profile
 from market_data import MarketDataFetcher
 from ai_advisor import AIAdvisor
@@ -12,12 +13,16 @@ from financial_projections import FinancialProjector
 from demo import get_demo_profile, print_demo_info
 from fallback_stocks import get_fallback_stock_data
 
+# Horizontal rule framing section headers
+_BAR = "=" * 70
+
+# Major blue chips always considered for recommendations
+_BLUE_CHIPS = ('AAPL', 'MSFT', 'GOOGL', 'JNJ', 'JPM', 'V', 'WMT', 'PG')
+
 
 def print_section_header(title: str):
     """Print a formatted section header"""
-    print("\n" + "=" * 70)
-    print(f"  {title}")
-    print("=" * 70 + "\n")
+    sys.stdout.write(f"\n{_BAR}\n  {title}\n{_BAR}\n\n")
 
 
 def print_profile_summary(profile: UserProfile):
@@ -72,13 +77,14 @@ def print_stock_recommendations(recommendations: list):
     print(f"Top {len(recommendations)} Stock Recommendations:\n")
     
     for i, stock in enumerate(recommendations, 1):
+        dividend_yield, pe_ratio = stock['dividend_yield'], stock['pe_ratio']
         print(f"{i}. {stock['ticker']} - {stock['name']}")
         print(f"   Sector: {stock['sector']}")
         print(f"   Current Price: ${stock['current_price']:.2f}")
-        if stock['dividend_yield']:
-            print(f"   Dividend Yield: {stock['dividend_yield']*100:.2f}%")
-        if stock['pe_ratio']:
-            print(f"   P/E Ratio: {stock['pe_ratio']:.2f}")
+        if dividend_yield:
+            print(f"   Dividend Yield: {dividend_yield*100:.2f}%")
+        if pe_ratio:
+            print(f"   P/E Ratio: {pe_ratio:.2f}")
         print(f"   Score: {stock['score']:.1f}/100")
         print(f"   Why: {stock['rationale']}")
         print()
@@ -116,13 +122,14 @@ def print_projections(summary: dict, detailed_projections: dict):
     print(f"  Income Replacement Ratio: {retirement['replacement_ratio']:.1f}%")
     print(f"  Retirement Goal: ${retirement['retirement_goal']:,.2f}")
     
+    surplus_shortfall = retirement['surplus_shortfall']
     if retirement['on_track']:
         print(f"  Status: ✓ On track for retirement!")
-        if retirement['surplus_shortfall'] > 0:
-            print(f"  Projected surplus: ${retirement['surplus_shortfall']:,.2f}")
+        if surplus_shortfall > 0:
+            print(f"  Projected surplus: ${surplus_shortfall:,.2f}")
     else:
         print(f"  Status: ⚠ Below retirement goal")
-        print(f"  Shortfall: ${abs(retirement['surplus_shortfall']):,.2f}")
+        print(f"  Shortfall: ${abs(surplus_shortfall):,.2f}")
     
     # Show year-by-year projections for first 10 years
     print("\n" + "-" * 70)
@@ -131,11 +138,14 @@ def print_projections(summary: dict, detailed_projections: dict):
     print(f"{'Year':<6} {'Age':<6} {'Net Worth':<18} {'Annual Income':<18} {'Savings':<15}")
     print("-" * 70)
     
-    for proj in detailed_projections['net_worth'][:11]:
-        print(f"{proj['year']:<6} {proj['age']:<6} "
-              f"${proj['net_worth']:>15,.2f}  "
-              f"${proj['annual_income']:>15,.2f}  "
-              f"${proj['annual_savings']:>13,.2f}")
+    rows = [
+        f"{proj['year']:<6} {proj['age']:<6} "
+        f"${proj['net_worth']:>15,.2f}  "
+        f"${proj['annual_income']:>15,.2f}  "
+        f"${proj['annual_savings']:>13,.2f}"
+        for proj in detailed_projections['net_worth'][:11]
+    ]
+    sys.stdout.write('\n'.join(rows) + '\n')
 
 
 def print_dividend_projection(dividend_projections: list):
@@ -146,10 +156,13 @@ def print_dividend_projection(dividend_projections: list):
     print(f"{'Year':<6} {'Age':<6} {'Portfolio Value':<18} {'Annual Dividend':<18}")
     print("-" * 70)
     
-    for proj in dividend_projections[:11]:
-        print(f"{proj['year']:<6} {proj['age']:<6} "
-              f"${proj['portfolio_value']:>15,.2f}  "
-              f"${proj['annual_dividend']:>15,.2f}")
+    rows = [
+        f"{proj['year']:<6} {proj['age']:<6} "
+        f"${proj['portfolio_value']:>15,.2f}  "
+        f"${proj['annual_dividend']:>15,.2f}"
+        for proj in dividend_projections[:11]
+    ]
+    sys.stdout.write('\n'.join(rows) + '\n')
 
 
 def run_interactive_mode(demo_scenario=None):
@@ -201,16 +214,16 @@ def run_interactive_mode(demo_scenario=None):
         all_stocks.extend(market_data.get_dividend_stocks(limit=10))
     
     # Add major blue chips
-    all_stocks.extend(['AAPL', 'MSFT', 'GOOGL', 'JNJ', 'JPM', 'V', 'WMT', 'PG'])
+    all_stocks.extend(_BLUE_CHIPS)
     
-    # Remove duplicates
-    all_stocks = list(set(all_stocks))
+    # Remove duplicates, keeping preferred-sector tickers first
+    all_stocks = list(dict.fromkeys(all_stocks))
     
-    # Fetch detailed stock info
+    # Fetch detailed stock info concurrently
     stock_data = []
     fetch_errors = 0
-    for ticker in all_stocks[:30]:  # Limit to 30 to avoid rate limits
-        data = market_data.get_stock_info(ticker)
+    # Limit to 30 to avoid rate limits
+    for data in asyncio.run(market_data.fetch_all_async(all_stocks[:30])):
         if data:
             stock_data.append(data)
         else:
@@ -256,9 +269,9 @@ def run_interactive_mode(demo_scenario=None):
     print_dividend_projection(dividend_proj)
     
     # Final message
-    print("\n" + "=" * 70)
+    print(f"\n{_BAR}")
     print("                    ANALYSIS COMPLETE")
-    print("=" * 70)
+    print(_BAR)
     print("\nThank you for using wAIrrenbuffett!")
     print("\nDisclaimer: This analysis is for educational purposes only.")
     print("Always consult with a qualified financial advisor before making")
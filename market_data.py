@@ -1,51 +1,417 @@
 """
 Market Data Module - Fetches and analyzes stock market data
 """
-import yfinance as yf
-import pandas as pd
-from typing import List, Dict, Optional
+import asyncio
+import numpy as np
+from typing import List, Dict, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+import os
+import pickle
+import re
+import threading
+import time
+
+# yfinance and pandas take hundreds of milliseconds to import, so they are
+# imported inside the methods that fetch data
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Yahoo endpoints used by the async fetch path
+_YAHOO_COOKIE_URL = 'https://fc.yahoo.com'
+_YAHOO_CRUMB_URL = 'https://query1.finance.yahoo.com/v1/test/getcrumb'
+_YAHOO_QUOTE_SUMMARY_URL = 'https://query2.finance.yahoo.com/v10/finance/quoteSummary/{}'
+_YAHOO_QUOTE_URL = 'https://query1.finance.yahoo.com/v7/finance/quote'
+# Same modules and parameters yfinance requests for Ticker.info
+_YAHOO_MODULES = 'financialData,quoteType,defaultKeyStatistics,assetProfile,summaryDetail'
+_YAHOO_PARAMS = {'formatted': 'false', 'lang': 'en-US', 'region': 'US'}
+_YAHOO_HEADERS = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko)'}
+
+# Fetched market data is persisted here and reused for a day
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'wairren', 'market')
+CACHE_TTL = 24 * 60 * 60  # seconds
+
+# Per-request limits for Yahoo calls, so one stalled ticker cannot hold up a batch
+REQUEST_TIMEOUT = 5.0  # seconds
+REQUEST_RETRIES = 2
+
+# Predefined lists of major stocks by sector
+_SECTOR_STOCKS = {
+    'technology': ('AAPL', 'MSFT', 'GOOGL', 'META', 'NVDA', 'AVGO', 'CSCO', 'ADBE', 'CRM', 'INTC'),
+    'healthcare': ('JNJ', 'UNH', 'PFE', 'ABBV', 'MRK', 'TMO', 'ABT', 'DHR', 'LLY', 'BMY'),
+    'finance': ('JPM', 'BAC', 'WFC', 'C', 'GS', 'MS', 'BLK', 'SCHW', 'AXP', 'USB'),
+    'energy': ('XOM', 'CVX', 'COP', 'SLB', 'EOG', 'MPC', 'PSX', 'VLO', 'OXY', 'HAL'),
+    'consumer': ('AMZN', 'TSLA', 'WMT', 'HD', 'NKE', 'MCD', 'SBUX', 'TGT', 'LOW', 'DIS'),
+    'industrial': ('BA', 'HON', 'UNP', 'CAT', 'GE', 'MMM', 'LMT', 'RTX', 'DE', 'UPS'),
+    'utilities': ('NEE', 'DUK', 'SO', 'D', 'AEP', 'EXC', 'SRE', 'PEG', 'XEL', 'ED'),
+    'real estate': ('AMT', 'PLD', 'CCI', 'EQIX', 'PSA', 'SPG', 'O', 'WELL', 'DLR', 'AVB'),
+    'materials': ('LIN', 'APD', 'SHW', 'FCX', 'NEM', 'ECL', 'DD', 'DOW', 'NUE', 'VMC'),
+    'telecommunications': ('T', 'VZ', 'TMUS', 'CMCSA', 'CHTR')
+}
+
+# Alternative sector names mapped to their canonical _SECTOR_STOCKS key
+_SECTOR_ALIASES = {
+    'tech': 'technology',
+    'financial': 'finance'
+}
+
+# Major market indices and their Yahoo symbols
+_MARKET_INDICES = {
+    'S&P 500': '^GSPC',
+    'Dow Jones': '^DJI',
+    'NASDAQ': '^IXIC'
+}
+
+# Well-known dividend aristocrats and high-yield stocks
+_DIVIDEND_STOCKS = (
+    'JNJ', 'PG', 'KO', 'PEP', 'MCD', 'WMT', 'XOM', 'CVX',
+    'T', 'VZ', 'IBM', 'ABBV', 'MMM', 'CAT', 'TGT', 'O',
+    'MO', 'SO', 'DUK', 'NEE'
+)
+
+
+def _truncate(text: Optional[str], length: int = 200) -> str:
+    """Shorten text to length characters, marking cut text with an ellipsis"""
+    if not text:
+        return ''
+    return text[:length] + '...' if len(text) > length else text
+
+
+def _stock_data(ticker: str, info: Dict) -> Dict:
+    """Extract the fields used for recommendations from a Yahoo info dict"""
+    return {
+        'ticker': ticker,
+        'name': info.get('longName', ticker),
+        'sector': info.get('sector', 'Unknown'),
+        'industry': info.get('industry', 'Unknown'),
+        'current_price': info.get('currentPrice', info.get('regularMarketPrice', 0)),
+        'market_cap': info.get('marketCap', 0),
+        'pe_ratio': info.get('trailingPE', 0),
+        'dividend_yield': info.get('dividendYield', 0),
+        'beta': info.get('beta', 1.0),
+        '52_week_high': info.get('fiftyTwoWeekHigh', 0),
+        '52_week_low': info.get('fiftyTwoWeekLow', 0),
+        'avg_volume': info.get('averageVolume', 0),
+        'description': _truncate(info.get('longBusinessSummary'))
+    }
+
+
+def _yahoo_info(ticker: str, summary: Dict, quote: Optional[Dict]) -> Dict:
+    """
+    Build the info dict yfinance's Ticker.info returns from raw Yahoo results
+    
+    Mirrors yfinance so both fetch paths cache identical data: the v7 quote
+    fields override the quoteSummary modules, modules are flattened into one
+    dict and {'raw': ..., 'fmt': ...} values are unwrapped.
+    
+    Args:
+        ticker: Stock symbol
+        summary: quoteSummary result for the ticker
+        quote: v7 quote result for the ticker, if Yahoo returned one
+    """
+    merged = dict(summary, symbol=ticker)
+    if quote:
+        merged.update(quote, symbol=ticker)
+    
+    info = {}
+    for key, value in merged.items():
+        if isinstance(value, dict):
+            for inner_key, inner_value in value.items():
+                if inner_value is not None:
+                    # Yahoo sometimes gives maxAge in days rather than seconds
+                    info[inner_key] = 86400 if inner_key == 'maxAge' and inner_value == 1 else inner_value
+        elif value is not None:
+            info[key] = value
+    
+    return {key: _yahoo_value(key, value) for key, value in info.items()}
+
+
+def _yahoo_value(key: Optional[str], value):
+    """Unwrap formatted Yahoo values the way yfinance does"""
+    if isinstance(value, dict) and 'raw' in value and 'fmt' in value:
+        return value['fmt'] if key in ('regularMarketTime', 'postMarketTime') else value['raw']
+    if isinstance(value, list):
+        return [_yahoo_value(None, item) for item in value]
+    if isinstance(value, dict):
+        return {inner_key: _yahoo_value(inner_key, item) for inner_key, item in value.items()}
+    if isinstance(value, str):
+        return value.replace('\xa0', ' ')
+    return value
+
+
+def _limited_session(timeout: float, retries: int):
+    """
+    Build an HTTP session for yfinance with capped timeouts and retries
+    
+    yfinance passes its own 30 second timeout on every request, so the
+    session's get/post are wrapped to clamp it. Requests that time out are
+    retried with exponential backoff; other errors fail immediately.
+    """
+    try:
+        from curl_cffi import requests as http
+        session = http.Session(impersonate='chrome')
+    except ImportError:
+        # Older yfinance releases use plain requests
+        import requests as http
+        session = http.Session()
+    
+    def limit(request):
+        @wraps(request)
+        def wrapper(*args, **kwargs):
+            kwargs['timeout'] = min(kwargs.get('timeout') or timeout, timeout)
+            for attempt in range(retries + 1):
+                try:
+                    return request(*args, **kwargs)
+                except http.exceptions.Timeout:
+                    if attempt == retries:
+                        raise
+                    time.sleep(0.3 * 2 ** attempt)
+        return wrapper
+    
+    session.get = limit(session.get)
+    session.post = limit(session.post)
+    return session
 
 
 class MarketDataFetcher:
     """Fetches market data for stocks and analysis"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: Optional[str] = CACHE_DIR, cache_ttl: float = CACHE_TTL,
+                 request_timeout: float = REQUEST_TIMEOUT, request_retries: int = REQUEST_RETRIES):
+        """
+        Initialize the fetcher
+        
+        Args:
+            cache_dir: Directory for the on-disk cache, or None to cache in memory only
+            cache_ttl: Seconds before a cached entry is fetched again
+            request_timeout: Maximum seconds to wait on a single Yahoo request
+            request_retries: Times a request is retried after timing out
+        """
         self.cache = {}
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.request_timeout = request_timeout
+        self.request_retries = request_retries
+        self._session = None
+        self._session_lock = threading.Lock()
+    
+    def _yf_session(self):
+        """Shared yfinance session, created on first use"""
+        with self._session_lock:
+            if self._session is None:
+                self._session = _limited_session(self.request_timeout, self.request_retries)
+            return self._session
+    
+    def _cache_path(self, key: str) -> str:
+        """File holding the on-disk cache entry for a key"""
+        return os.path.join(self.cache_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', key) + '.pkl')
+    
+    def _cache_get(self, key: str):
+        """
+        Return a fresh cached value for a key, or None
+        
+        Callers get a copy of the cached dict or DataFrame so they cannot modify it.
+        """
+        entry = self.cache.get(key)
+        if entry is not None and time.time() - entry[0] <= self.cache_ttl:
+            return entry[1].copy()
+        if not self.cache_dir:
+            return None
+        
+        path = self._cache_path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if time.time() - stored_at > self.cache_ttl:
+                return None
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        
+        self.cache[key] = (stored_at, value)
+        return value.copy()
+    
+    def _cache_set(self, key: str, value):
+        """Store a copy of a value in memory and on disk"""
+        self.cache[key] = (time.time(), value.copy())
+        if not self.cache_dir:
+            return
+        
+        path = self._cache_path(key)
+        # Write to a private temp file and rename so concurrent fetches never
+        # see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
     
     def get_stock_info(self, ticker: str) -> Dict:
         """Get detailed information about a stock"""
-        try:
-            stock = yf.Ticker(ticker)
-            info = stock.info
+        key = f"info_{ticker}"
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        import yfinance as yf
+        return self._fetch_stock_info(ticker, yf.Ticker(ticker, session=self._yf_session()))
+    
+    def get_stock_info_batch(self, tickers: List[str], max_workers: int = 8) -> List[Optional[Dict]]:
+        """
+        Get detailed information about several stocks
+        
+        Uncached tickers are fetched concurrently through one yf.Tickers object,
+        so the requests share a single HTTP session.
+        
+        Returns:
+            One entry per ticker, in the same order; None where the fetch failed
+        """
+        results = {ticker: self._cache_get(f"info_{ticker}") for ticker in tickers}
+        missing = [ticker for ticker in tickers if results[ticker] is None]
+        
+        if missing:
+            import yfinance as yf
+            batch = yf.Tickers(missing, session=self._yf_session())
+            
+            def fetch(ticker):
+                return self._fetch_stock_info(ticker, batch.tickers[ticker.upper()])
             
-            # Extract relevant information
-            stock_data = {
-                'ticker': ticker,
-                'name': info.get('longName', ticker),
-                'sector': info.get('sector', 'Unknown'),
-                'industry': info.get('industry', 'Unknown'),
-                'current_price': info.get('currentPrice', info.get('regularMarketPrice', 0)),
-                'market_cap': info.get('marketCap', 0),
-                'pe_ratio': info.get('trailingPE', 0),
-                'dividend_yield': info.get('dividendYield', 0),
-                'beta': info.get('beta', 1.0),
-                '52_week_high': info.get('fiftyTwoWeekHigh', 0),
-                '52_week_low': info.get('fiftyTwoWeekLow', 0),
-                'avg_volume': info.get('averageVolume', 0),
-                'description': info.get('longBusinessSummary', '')[:200] + '...' if info.get('longBusinessSummary') else ''
-            }
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for ticker, data in zip(missing, executor.map(fetch, missing)):
+                    results[ticker] = data
+        
+        return [results[ticker] for ticker in tickers]
+    
+    async def fetch_all_async(self, tickers: List[str]) -> List[Optional[Dict]]:
+        """
+        Get detailed information about several stocks on one event loop
+        
+        Uncached tickers are requested concurrently from Yahoo through a single
+        httpx.AsyncClient. Tickers the async path cannot fetch (httpx missing,
+        session handshake refused, or an error such as 401/429) are retried
+        with get_stock_info_batch.
+        
+        Returns:
+            One entry per ticker, in the same order; None where the fetch failed
+        """
+        results = {ticker: self._cache_get(f"info_{ticker}") for ticker in tickers}
+        missing = [ticker for ticker in tickers if results[ticker] is None]
+        if not missing:
+            return [results[ticker] for ticker in tickers]
+        
+        try:
+            import httpx
+        except ImportError:
+            httpx = None
+        
+        if httpx is not None:
+            # HTTP/2 multiplexes the requests over one connection, but needs h2
+            try:
+                import h2  # noqa: F401
+                http2 = True
+            except ImportError:
+                http2 = False
             
+            async with httpx.AsyncClient(http2=http2, timeout=self.request_timeout,
+                                         headers=_YAHOO_HEADERS, follow_redirects=True) as client:
+                try:
+                    # The cookie request answers 404 but still sets the session cookie
+                    await client.get(_YAHOO_COOKIE_URL)
+                    response = await client.get(_YAHOO_CRUMB_URL)
+                    response.raise_for_status()
+                    crumb = response.text
+                except httpx.HTTPError:
+                    crumb = None
+                
+                quotes = await self._get_quotes_async(missing, client, crumb) if crumb else None
+                if quotes is not None:
+                    fetched = await asyncio.gather(*(
+                        self.get_stock_info_async(ticker, client, crumb, quotes.get(ticker.upper()))
+                        for ticker in missing
+                    ))
+                    for ticker, data in zip(missing, fetched):
+                        results[ticker] = data
+        
+        retry = [ticker for ticker in missing if results[ticker] is None]
+        if retry:
+            loop = asyncio.get_running_loop()
+            fetched = await loop.run_in_executor(None, self.get_stock_info_batch, retry)
+            for ticker, data in zip(retry, fetched):
+                results[ticker] = data
+        return [results[ticker] for ticker in tickers]
+    
+    async def _get_quotes_async(self, tickers: List[str], client, crumb: str) -> Optional[Dict[str, Dict]]:
+        """v7 quote results for several tickers in one request, keyed by symbol; None on failure"""
+        try:
+            response = await client.get(_YAHOO_QUOTE_URL, params={
+                **_YAHOO_PARAMS, 'symbols': ','.join(tickers), 'crumb': crumb
+            })
+            response.raise_for_status()
+            quotes = response.json()['quoteResponse']['result'] or []
+        except Exception:
+            return None
+        return {quote.get('symbol'): quote for quote in quotes}
+    
+    async def get_stock_info_async(self, ticker: str, client, crumb: str,
+                                   quote: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Get detailed information about a stock with an httpx.AsyncClient
+        
+        Args:
+            ticker: Stock symbol
+            client: Shared httpx.AsyncClient holding the Yahoo session cookie
+            crumb: Session crumb matching the client's cookie
+            quote: The ticker's v7 quote result, merged over its quoteSummary
+        
+        Returns:
+            The same dict get_stock_info returns, or None if the request failed
+        """
+        key = f"info_{ticker}"
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        try:
+            response = await client.get(_YAHOO_QUOTE_SUMMARY_URL.format(ticker), params={
+                **_YAHOO_PARAMS, 'modules': _YAHOO_MODULES, 'corsDomain': 'finance.yahoo.com',
+                'symbol': ticker, 'crumb': crumb
+            })
+            response.raise_for_status()
+            summary = response.json()['quoteSummary']['result'][0]
+        except Exception:
+            return None
+        
+        stock_data = _stock_data(ticker, _yahoo_info(ticker, summary, quote))
+        self._cache_set(key, stock_data)
+        return stock_data
+    
+    def _fetch_stock_info(self, ticker: str, stock) -> Optional[Dict]:
+        """Fetch and cache the info of a yfinance Ticker"""
+        try:
+            stock_data = _stock_data(ticker, stock.info)
+            self._cache_set(f"info_{ticker}", stock_data)
             return stock_data
         except Exception as e:
             print(f"Error fetching data for {ticker}: {e}")
             return None
     
-    def get_historical_data(self, ticker: str, period: str = "1y") -> Optional[pd.DataFrame]:
+    def get_historical_data(self, ticker: str, period: str = "1y") -> Optional['pd.DataFrame']:
         """Get historical price data for a stock"""
+        key = f"history_{ticker}_{period}"
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            stock = yf.Ticker(ticker)
+            import yfinance as yf
+            stock = yf.Ticker(ticker, session=self._yf_session())
             hist = stock.history(period=period)
+            if not hist.empty:
+                self._cache_set(key, hist)
             return hist
         except Exception as e:
             print(f"Error fetching historical data for {ticker}: {e}")
@@ -57,13 +423,18 @@ class MarketDataFetcher:
         if hist is None or hist.empty:
             return None
         
-        start_price = hist['Close'].iloc[0]
-        end_price = hist['Close'].iloc[-1]
+        closes = hist['Close'].to_numpy(dtype=float)
+        start_price = float(closes[0])
+        end_price = float(closes[-1])
         total_return = ((end_price - start_price) / start_price) * 100
         
         # Calculate volatility (standard deviation of daily returns)
-        daily_returns = hist['Close'].pct_change().dropna()
-        volatility = daily_returns.std() * (252 ** 0.5) * 100  # Annualized
+        daily_returns = np.diff(closes) / closes[:-1]
+        daily_returns = daily_returns[~np.isnan(daily_returns)]
+        if daily_returns.size > 1:
+            volatility = daily_returns.std(ddof=1) * (252 ** 0.5) * 100  # Annualized
+        else:
+            volatility = float('nan')
         
         return {
             'ticker': ticker,
@@ -74,57 +445,43 @@ class MarketDataFetcher:
             'end_price': round(end_price, 2)
         }
     
-    def get_sector_stocks(self, sector: str, limit: int = 10) -> List[str]:
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def get_sector_stocks(sector: str, limit: int = 10) -> Tuple[str, ...]:
         """Get popular stocks from a specific sector"""
-        # Predefined lists of major stocks by sector
-        sector_stocks = {
-            'technology': ['AAPL', 'MSFT', 'GOOGL', 'META', 'NVDA', 'AVGO', 'CSCO', 'ADBE', 'CRM', 'INTC'],
-            'tech': ['AAPL', 'MSFT', 'GOOGL', 'META', 'NVDA', 'AVGO', 'CSCO', 'ADBE', 'CRM', 'INTC'],
-            'healthcare': ['JNJ', 'UNH', 'PFE', 'ABBV', 'MRK', 'TMO', 'ABT', 'DHR', 'LLY', 'BMY'],
-            'finance': ['JPM', 'BAC', 'WFC', 'C', 'GS', 'MS', 'BLK', 'SCHW', 'AXP', 'USB'],
-            'financial': ['JPM', 'BAC', 'WFC', 'C', 'GS', 'MS', 'BLK', 'SCHW', 'AXP', 'USB'],
-            'energy': ['XOM', 'CVX', 'COP', 'SLB', 'EOG', 'MPC', 'PSX', 'VLO', 'OXY', 'HAL'],
-            'consumer': ['AMZN', 'TSLA', 'WMT', 'HD', 'NKE', 'MCD', 'SBUX', 'TGT', 'LOW', 'DIS'],
-            'industrial': ['BA', 'HON', 'UNP', 'CAT', 'GE', 'MMM', 'LMT', 'RTX', 'DE', 'UPS'],
-            'utilities': ['NEE', 'DUK', 'SO', 'D', 'AEP', 'EXC', 'SRE', 'PEG', 'XEL', 'ED'],
-            'real estate': ['AMT', 'PLD', 'CCI', 'EQIX', 'PSA', 'SPG', 'O', 'WELL', 'DLR', 'AVB'],
-            'materials': ['LIN', 'APD', 'SHW', 'FCX', 'NEM', 'ECL', 'DD', 'DOW', 'NUE', 'VMC'],
-            'telecommunications': ['T', 'VZ', 'TMUS', 'CMCSA', 'CHTR']
-        }
-        
-        sector_lower = sector.lower()
-        stocks = sector_stocks.get(sector_lower, [])
-        return stocks[:limit]
+        sector = sector.lower()
+        sector = _SECTOR_ALIASES.get(sector, sector)
+        return _SECTOR_STOCKS.get(sector, ())[:limit]
     
-    def get_dividend_stocks(self, limit: int = 20) -> List[str]:
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def get_dividend_stocks(limit: int = 20) -> Tuple[str, ...]:
         """Get a list of high dividend yield stocks"""
-        # Well-known dividend aristocrats and high-yield stocks
-        dividend_stocks = [
-            'JNJ', 'PG', 'KO', 'PEP', 'MCD', 'WMT', 'XOM', 'CVX',
-            'T', 'VZ', 'IBM', 'ABBV', 'MMM', 'CAT', 'TGT', 'O',
-            'MO', 'SO', 'DUK', 'NEE'
-        ]
-        return dividend_stocks[:limit]
+        return _DIVIDEND_STOCKS[:limit]
     
     def get_market_indices(self) -> Dict:
         """Get current values of major market indices"""
-        indices = {
-            'S&P 500': '^GSPC',
-            'Dow Jones': '^DJI',
-            'NASDAQ': '^IXIC'
-        }
+        import yfinance as yf
+        
+        # One download covers every index; two days of closes give the day's change
+        data = yf.download(tickers=list(_MARKET_INDICES.values()), period='2d',
+                           group_by='ticker', progress=False,
+                           timeout=self.request_timeout, session=self._yf_session())
         
         results = {}
-        for name, ticker in indices.items():
+        for name, ticker in _MARKET_INDICES.items():
             try:
-                index = yf.Ticker(ticker)
-                info = index.info
+                closes = data[ticker]['Close'].dropna().to_numpy()
+                if not len(closes):
+                    raise KeyError(f"no price data for {ticker}")
+                value = float(closes[-1])
+                change = float(closes[-1] - closes[-2]) if len(closes) > 1 else 0.0
                 results[name] = {
-                    'value': info.get('regularMarketPrice', 0),
-                    'change': info.get('regularMarketChange', 0),
-                    'change_percent': info.get('regularMarketChangePercent', 0)
+                    'value': value,
+                    'change': change,
+                    'change_percent': change / (value - change) * 100 if change else 0.0
                 }
-            except Exception as e:
+            except KeyError as e:
                 print(f"Error fetching {name}: {e}")
                 results[name] = {'value': 0, 'change': 0, 'change_percent': 0}
         
@@ -3,7 +3,16 @@
 Basic tests for wAIrrenbuffett modules
 """
 import sys
-from user_profile import UserProfile
+import asyncio
+import contextlib
+import io
+import json
+import os
+import tempfile
+import ai_advisor
+import market_data
+from market_data import MarketDataFetcher
+from user_profile import UserProfile, collect_user_profile
 from ai_advisor import AIAdvisor
 from financial_projections import FinancialProjector
 from fallback_stocks import get_fallback_stock_data
@@ -39,6 +48,51 @@ def test_user_profile():
     return profile
 
 
+def test_collect_user_profile():
+    """Test collecting a profile from scripted, non-terminal input"""
+    print("\nTesting Profile Collection...")
+    answers = [
+        "30", "New York, USA",
+        "90000", "20000", "3000", "10000",
+        "Engineering", "35", "3.5",
+        "single", "0",
+        "Buy a house", "",
+        "Moderate", "30",
+        "technology", "healthcare", "",
+        "None"
+    ]
+    
+    saved_stdin = sys.stdin
+    sys.stdin = io.StringIO("\n".join(answers) + "\n")
+    try:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            profile = collect_user_profile()
+    finally:
+        sys.stdin = saved_stdin
+    
+    assert profile.age == 30
+    assert profile.location == "New York, USA"
+    assert profile.major_life_goals == ("Buy a house",)
+    assert profile.risk_tolerance == "moderate"
+    assert profile.preferred_sectors == ("technology", "healthcare")
+    assert profile.other_notes == "None"
+    assert "What is your age? " in output.getvalue()
+    
+    # Running out of answers raises EOFError like input()
+    sys.stdin = io.StringIO("30\n")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            collect_user_profile()
+        assert False, "expected EOFError"
+    except EOFError:
+        pass
+    finally:
+        sys.stdin = saved_stdin
+    
+    print("✓ Profile Collection test passed")
+
+
 def test_ai_advisor(profile):
     """Test AI advisor functionality"""
     print("\nTesting AI Advisor...")
@@ -58,6 +112,180 @@ def test_ai_advisor(profile):
     return analysis
 
 
+class _UnreachableOllama:
+    """Stand-in for the ollama module when the server has gone away"""
+    
+    def generate(self, **kwargs):
+        raise ConnectionError("Failed to connect to Ollama")
+
+
+def test_ollama_fallback(profile):
+    """Test that a failing Ollama server drops back to rule-based mode"""
+    print("\nTesting Ollama Fallback...")
+    saved = ai_advisor._OLLAMA_READY_PATH, ai_advisor._OLLAMA_READY
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        ai_advisor._OLLAMA_READY_PATH = os.path.join(tmp, 'ollama_ready.json')
+        ai_advisor._OLLAMA_READY = {ai_advisor.OLLAMA_MODEL}
+        try:
+            advisor = AIAdvisor(use_ollama=False)
+            advisor.use_ollama = True
+            advisor.ollama_client = _UnreachableOllama()
+            advisor.analyze_profile(profile)
+            
+            assert not advisor.use_ollama
+            assert advisor.ollama_client is None
+            assert ai_advisor.OLLAMA_MODEL not in ai_advisor._OLLAMA_READY
+            with open(ai_advisor._OLLAMA_READY_PATH) as f:
+                assert json.load(f) == []
+        finally:
+            ai_advisor._OLLAMA_READY_PATH, ai_advisor._OLLAMA_READY = saved
+    
+    print("✓ Ollama Fallback test passed")
+
+
+class _StubAsyncClient:
+    """Stand-in for ollama.AsyncClient that answers with canned insights"""
+    prompts = []
+    closed = 0
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        _StubAsyncClient.closed += 1
+    
+    async def generate(self, model, system, prompt):
+        _StubAsyncClient.prompts.append(prompt)
+        return {'response': f"Insight #{len(_StubAsyncClient.prompts)}"}
+
+
+class _StubOllama:
+    """Stand-in for the ollama module exposing the stub AsyncClient"""
+    AsyncClient = _StubAsyncClient
+
+
+def test_batch_analysis():
+    """Test concurrent batch analysis with a stubbed Ollama AsyncClient"""
+    print("\nTesting Batch Analysis...")
+    profiles = [get_demo_profile(scenario) for scenario in ('young', 'moderate')]
+    advisor = AIAdvisor(use_ollama=False)
+    advisor.use_ollama = True
+    advisor.ollama_client = _StubOllama()
+    
+    analyses = asyncio.run(advisor.analyze_profiles_batch(profiles))
+    assert len(analyses) == 2
+    assert all(analysis['ai_insights'].startswith("Insight #") for analysis in analyses)
+    assert analyses[0]['ai_insights'] != analyses[1]['ai_insights']
+    assert _StubAsyncClient.closed == 1
+    
+    # A second batch is answered from the insights cache
+    again = asyncio.run(advisor.analyze_profiles_batch(profiles))
+    assert [a['ai_insights'] for a in again] == [a['ai_insights'] for a in analyses]
+    assert len(_StubAsyncClient.prompts) == 2
+    
+    print("✓ Batch Analysis test passed")
+
+
+class _StubTicker:
+    """Stand-in for yfinance.Ticker with fixed info"""
+    info = {'longName': 'Test Corp', 'sector': 'Technology', 'currentPrice': 100.0}
+
+
+def test_market_data_cache():
+    """Test the in-memory and on-disk market data cache"""
+    print("\nTesting Market Data Cache...")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        fetcher = MarketDataFetcher(cache_dir=tmp)
+        fetched = fetcher._fetch_stock_info('TEST', _StubTicker())
+        assert fetched['name'] == 'Test Corp'
+        
+        # Mutating a returned value must not reach the cache
+        fetched['current_price'] = -1
+        cached = fetcher.get_stock_info('TEST')
+        assert cached['current_price'] == 100.0
+        cached['current_price'] = -1
+        assert fetcher.get_stock_info('TEST')['current_price'] == 100.0
+        
+        # A new fetcher reads the entry back from disk
+        assert MarketDataFetcher(cache_dir=tmp).get_stock_info('TEST') == fetcher.get_stock_info('TEST')
+        assert not [name for name in os.listdir(tmp) if name.endswith('.tmp')]
+        
+        # Expired entries are ignored in memory and on disk
+        fetcher.cache_ttl = -1
+        assert fetcher._cache_get('info_TEST') is None
+        assert MarketDataFetcher(cache_dir=tmp, cache_ttl=-1)._cache_get('info_TEST') is None
+    
+    print("✓ Market Data Cache test passed")
+
+
+# Raw Yahoo responses for one ticker, with fields that overlap between endpoints
+_QUOTE_SUMMARY_JSON = {'quoteSummary': {'result': [{
+    'financialData': {'maxAge': 86400, 'currentPrice': 100.0},
+    'summaryDetail': {'maxAge': 1, 'dividendYield': 0.0041, 'beta': 1.2, 'trailingPE': {'raw': 30.5, 'fmt': '30.50'}},
+    'assetProfile': {'sector': 'Technology', 'industry': 'Software', 'longBusinessSummary': 'Makes\xa0software.'}
+}], 'error': None}}
+_QUOTE_JSON = {'quoteResponse': {'result': [{
+    'symbol': 'TEST', 'longName': 'Test Corp', 'dividendYield': 0.41, 'marketCap': 5000000, 'averageVolume': None
+}], 'error': None}}
+
+
+def test_async_market_data():
+    """Test the async fetch path's info mapping and per-ticker fallback"""
+    print("\nTesting Async Market Data...")
+    import httpx
+    
+    # Raw values unwrapped, maxAge in seconds, None dropped, summaryDetail's yield
+    # replaced by the quote's percentage, as yfinance's Ticker.info returns them
+    expected = {
+        'maxAge': 86400,
+        'currentPrice': 100.0,
+        'dividendYield': 0.41,
+        'beta': 1.2,
+        'trailingPE': 30.5,
+        'sector': 'Technology',
+        'industry': 'Software',
+        'longBusinessSummary': 'Makes software.',
+        'symbol': 'TEST',
+        'longName': 'Test Corp',
+        'marketCap': 5000000,
+    }
+    info = market_data._yahoo_info(
+        'TEST',
+        _QUOTE_SUMMARY_JSON['quoteSummary']['result'][0],
+        _QUOTE_JSON['quoteResponse']['result'][0]
+    )
+    assert info == expected
+    
+    # Yahoo rejects OTHER's quoteSummary; only that ticker goes to the yfinance batch
+    def handler(request):
+        if 'getcrumb' in request.url.path:
+            return httpx.Response(200, text='crumb')
+        if '/v7/finance/quote' in request.url.path:
+            return httpx.Response(200, json=_QUOTE_JSON)
+        if request.url.path.endswith('/TEST'):
+            return httpx.Response(200, json=_QUOTE_SUMMARY_JSON)
+        return httpx.Response(429)
+    
+    real_client = httpx.AsyncClient
+    httpx.AsyncClient = lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs)
+    try:
+        fetcher = MarketDataFetcher(cache_dir=None)
+        retried = []
+        fetcher.get_stock_info_batch = lambda tickers: retried.extend(tickers) or [None] * len(tickers)
+        results = asyncio.run(fetcher.fetch_all_async(['TEST', 'OTHER']))
+    finally:
+        httpx.AsyncClient = real_client
+    
+    assert results[0] == market_data._stock_data('TEST', expected)
+    assert results[0]['dividend_yield'] == 0.41
+    assert results[1] is None
+    assert retried == ['OTHER']
+    
+    print("✓ Async Market Data test passed")
+
+
 def test_stock_recommendations(profile):
     """Test stock recommendation generation"""
     print("\nTesting Stock Recommendations...")
@@ -109,6 +337,7 @@ def test_financial_projections(profile, allocation):
     # Test portfolio returns
     returns = projector.project_portfolio_returns(profile, allocation, years=10)
     assert len(returns) == 11
+    assert all(r['worst_case'] <= r['median_case'] <= r['best_case'] for r in returns)
     
     # Test retirement readiness
     retirement = projector.calculate_retirement_readiness(profile, net_worth)
@@ -141,6 +370,30 @@ def test_demo_profiles():
     print("✓ All demo profiles test passed")
 
 
+def test_numba_parity():
+    """Test that the Numba kernels match the NumPy projections to the cent"""
+    print("\nTesting Numba Parity...")
+    advisor = AIAdvisor(use_ollama=False)
+    numpy_projector = FinancialProjector(use_numba=False)
+    numba_projector = FinancialProjector(use_numba=True)
+    
+    for scenario in ['young', 'moderate', 'conservative', 'retirement']:
+        profile = get_demo_profile(scenario)
+        allocation = advisor.analyze_profile(profile)['recommended_allocation']
+        
+        expected = numpy_projector.project_net_worth(profile, allocation)
+        actual = numba_projector.project_net_worth(profile, allocation)
+        assert [round(v, 2) for v in actual['net_worth']] == [round(v, 2) for v in expected['net_worth']]
+        
+        expected = numpy_projector.project_portfolio_returns(profile, allocation)
+        actual = numba_projector.project_portfolio_returns(profile, allocation)
+        for column in ['expected_value', 'conservative_case']:
+            assert [round(r[column], 2) for r in actual] == [round(r[column], 2) for r in expected]
+        print(f"  ✓ {scenario.capitalize()} projections match")
+    
+    print("✓ Numba Parity test passed")
+
+
 def test_comprehensive_workflow():
     """Test complete workflow"""
     print("\nTesting Comprehensive Workflow...")
@@ -189,13 +442,19 @@ def main():
     
     try:
         profile = test_user_profile()
+        test_collect_user_profile()
         analysis = test_ai_advisor(profile)
+        test_ollama_fallback(profile)
+        test_batch_analysis()
+        test_market_data_cache()
+        test_async_market_data()
         recommendations = test_stock_recommendations(profile)
         projections = test_financial_projections(
             profile, 
             analysis['recommended_allocation']
         )
         test_demo_profiles()
+        test_numba_parity()
         test_comprehensive_workflow()
         
         print("\n" + "=" * 60)
@@ -1,14 +1,28 @@
 """
 User Profile Module - Collects and manages user financial profile information
 """
-from dataclasses import dataclass
-from typing import Optional, List
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
 import json
+import sys
 
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+def _list_fields_dict(items) -> dict:
+    """asdict factory turning tuple fields back into JSON-style lists"""
+    return {key: list(value) if isinstance(value, tuple) else value for key, value in items}
+
+
+@dataclass(frozen=True, **_SLOTS)
 class UserProfile:
-    """User financial profile data"""
+    """
+    User financial profile data
+    
+    Profiles are immutable and hashable so they can be used as cache keys;
+    list fields are stored as tuples.
+    """
     # Personal Information
     age: int
     location: str
@@ -27,36 +41,24 @@ class UserProfile:
     # Family & Dependents
     marital_status: str
     num_dependents: int
-    major_life_goals: List[str]
+    major_life_goals: Tuple[str, ...]
     
     # Investment Profile
     risk_tolerance: str  # conservative, moderate, aggressive
     investment_horizon: int  # years
-    preferred_sectors: List[str]
+    preferred_sectors: Tuple[str, ...]
     
     # Additional Context
     other_notes: str = ""
     
+    def __post_init__(self):
+        # Lists (e.g. from JSON or older callers) become tuples so the profile stays hashable
+        object.__setattr__(self, 'major_life_goals', tuple(self.major_life_goals))
+        object.__setattr__(self, 'preferred_sectors', tuple(self.preferred_sectors))
+    
     def to_dict(self):
-        """Convert profile to dictionary"""
-        return {
-            'age': self.age,
-            'location': self.location,
-            'annual_income': self.annual_income,
-            'current_savings': self.current_savings,
-            'monthly_expenses': self.monthly_expenses,
-            'total_debt': self.total_debt,
-            'career_field': self.career_field,
-            'years_to_retirement': self.years_to_retirement,
-            'expected_income_growth': self.expected_income_growth,
-            'marital_status': self.marital_status,
-            'num_dependents': self.num_dependents,
-            'major_life_goals': self.major_life_goals,
-            'risk_tolerance': self.risk_tolerance,
-            'investment_horizon': self.investment_horizon,
-            'preferred_sectors': self.preferred_sectors,
-            'other_notes': self.other_notes
-        }
+        """Convert profile to dictionary, with list fields as lists"""
+        return asdict(self, dict_factory=_list_fields_dict)
     
     @classmethod
     def from_dict(cls, data: dict):
@@ -144,10 +146,10 @@ def collect_user_profile() -> UserProfile:
         expected_income_growth=expected_income_growth,
         marital_status=marital_status,
         num_dependents=num_dependents,
-        major_life_goals=major_life_goals,
+        major_life_goals=tuple(major_life_goals),
         risk_tolerance=risk_tolerance,
         investment_horizon=investment_horizon,
-        preferred_sectors=preferred_sectors,
+        preferred_sectors=tuple(preferred_sectors),
         other_notes=other_notes
     )
     